@@ -7,26 +7,77 @@ FastAPI backend for fetching and serving Telegram Premium Custom Emojis.
 import os
 import re
 import json
+import time
 import asyncio
-from typing import Optional, List
+import hashlib
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from collections import OrderedDict
+from typing import Optional, List, Tuple, Type, Callable, Awaitable
 from contextlib import asynccontextmanager
+from urllib.parse import quote_from_bytes
 
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Query, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse
 from pydantic import BaseModel, Field
 import httpx
+import orjson
+import aiofiles
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.backends.redis import RedisBackend
+from redis import asyncio as aioredis
+
+# Logging: writes go straight to stderr by default (e.g. scripts using
+# TelegramAPI directly); while the app runs, lifespan swaps in a queue so
+# records are written by a background listener thread instead
+logger = logging.getLogger("tmoji")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+logger.addHandler(_log_handler)
+_log_queue: SimpleQueue = SimpleQueue()
+_log_queue_handler = QueueHandler(_log_queue)
+_log_listener = QueueListener(_log_queue, _log_handler)
 
 # Telegram Bot API configuration
 BOT_TOKEN = os.getenv("BOT_TOKEN", "")
 TELEGRAM_API_BASE = "https://api.telegram.org/bot"
 
+# Worker processes (same variable uvicorn's CLI reads). Each worker has its
+# own TelegramAPI, so the per-bot request ceiling is split between them
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+TELEGRAM_MAX_CONCURRENCY = max(1, 20 // WEB_CONCURRENCY)
+
+# file_id -> download URL cache (Telegram keeps file_path valid for ~1 hour)
+FILE_URL_CACHE_SIZE = 4096
+FILE_URL_CACHE_TTL = 45 * 60
+
+# Response cache configuration (falls back to in-memory when unset)
+REDIS_URL = os.getenv("REDIS_URL", "")
+CACHE_PREFIX = "tmoji"
+CACHE_TTL_SHORT = 10
+CACHE_TTL_NORMAL = 60
+CACHE_TTL_LONG = 300
+
 # Storage paths
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
 ASSETS_DIR = os.path.join(DATA_DIR, "assets")
 os.makedirs(ASSETS_DIR, exist_ok=True)
 
+# When set (e.g. "/internal-assets/"), /assets/* is handed off to nginx
+# via X-Accel-Redirect instead of being served from Python
+ASSETS_ACCEL_PREFIX = os.getenv("ASSETS_ACCEL_PREFIX", "")
+
+# Large downloads are split into parallel byte-range requests
+DOWNLOAD_SHARDS = 4
+DOWNLOAD_SHARD_MIN_SIZE = 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
 
 # Pydantic Models
 class EmojiData(BaseModel):
@@ -52,6 +103,10 @@ class EmojiPack(BaseModel):
     thumbnail: Optional[str] = Field(None, description="Pack thumbnail URL")
 
 
+class EmojiBatchRequest(BaseModel):
+    ids: List[str] = Field(..., max_length=200, description="Custom emoji IDs (up to 200)")
+
+
 class ErrorResponse(BaseModel):
     detail: str
 
@@ -61,66 +116,176 @@ class TelegramAPI:
     def __init__(self, token: str):
         self.token = token
         self.base_url = f"{TELEGRAM_API_BASE}{token}"
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # One pooled HTTP/2 connection multiplexes the per-sticker fan-out
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=httpx.Limits(
+                max_keepalive_connections=50,
+                max_connections=100,
+                keepalive_expiry=60.0,
+            ),
+            retries=2,
+        )
+        self.client = httpx.AsyncClient(transport=transport, timeout=30.0)
+        # File downloads use HTTP/1.1 so range shards get their own connections
+        # instead of being multiplexed over the shared HTTP/2 socket
+        self.download_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=TELEGRAM_MAX_CONCURRENCY * DOWNLOAD_SHARDS),
+        )
+        # Per-bot ceiling on in-flight requests to stay under Telegram rate limits
+        self._sem = asyncio.Semaphore(TELEGRAM_MAX_CONCURRENCY)
+        self._file_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
 
     async def get_sticker_set(self, name: str) -> Optional[dict]:
         """Get sticker set by name"""
         url = f"{self.base_url}/getStickerSet"
         try:
-            response = await self.client.post(url, json={"name": name})
-            data = response.json()
+            async with self._sem:
+                response = await self.client.post(url, json={"name": name})
+            data = orjson.loads(response.content)
             if data.get("ok"):
                 return data.get("result")
             return None
         except Exception as e:
-            print(f"Error fetching sticker set: {e}")
+            logger.error("Error fetching sticker set %s: %s", name, self._redact(e))
             return None
 
     async def get_custom_emoji_stickers(self, custom_emoji_ids: List[str]) -> List[dict]:
         """Get custom emoji stickers by IDs"""
         url = f"{self.base_url}/getCustomEmojiStickers"
         try:
-            response = await self.client.post(url, json={"custom_emoji_ids": custom_emoji_ids})
-            data = response.json()
+            async with self._sem:
+                response = await self.client.post(url, json={"custom_emoji_ids": custom_emoji_ids})
+            data = orjson.loads(response.content)
             if data.get("ok"):
                 return data.get("result", [])
             return []
         except Exception as e:
-            print(f"Error fetching custom emojis: {e}")
+            logger.error("Error fetching custom emojis %s: %s", custom_emoji_ids, self._redact(e))
             return []
 
     async def get_file(self, file_id: str) -> Optional[str]:
         """Get file download URL"""
+        cached = self._file_cache.get(file_id)
+        if cached and cached[0] > time.monotonic():
+            self._file_cache.move_to_end(file_id)
+            return cached[1]
+
         url = f"{self.base_url}/getFile"
         try:
-            response = await self.client.post(url, json={"file_id": file_id})
-            data = response.json()
+            async with self._sem:
+                response = await self.client.post(url, json={"file_id": file_id})
+            data = orjson.loads(response.content)
             if data.get("ok"):
                 file_path = data["result"].get("file_path")
                 if file_path:
-                    return f"https://api.telegram.org/file/bot{self.token}/{file_path}"
+                    file_url = f"https://api.telegram.org/file/bot{self.token}/{file_path}"
+                    self._cache_file_url(file_id, file_url)
+                    return file_url
             return None
         except Exception as e:
-            print(f"Error fetching file: {e}")
+            logger.error("Error fetching file %s: %s", file_id, self._redact(e))
             return None
 
+    def _redact(self, error: Exception) -> str:
+        """Error text safe to log: Telegram URLs embed the bot token"""
+        return f"{type(error).__name__}: {error}".replace(self.token, "<token>")
+
+    def _cache_file_url(self, file_id: str, file_url: str):
+        """Store resolved file URL, evicting least recently used entries"""
+        self._file_cache[file_id] = (time.monotonic() + FILE_URL_CACHE_TTL, file_url)
+        self._file_cache.move_to_end(file_id)
+        if len(self._file_cache) > FILE_URL_CACHE_SIZE:
+            self._file_cache.popitem(last=False)
+
     async def download_file(self, file_url: str, local_path: str) -> bool:
         """Download file from Telegram"""
         try:
-            async with self.client.stream("GET", file_url) as response:
-                if response.status_code == 200:
-                    os.makedirs(os.path.dirname(local_path), exist_ok=True)
-                    with open(local_path, "wb") as f:
-                        async for chunk in response.aiter_bytes():
-                            f.write(chunk)
-                    return True
-            return False
+            os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            async with self._sem:
+                return await self._download(file_url, local_path)
         except Exception as e:
-            print(f"Error downloading file: {e}")
+            logger.error("Error downloading file to %s: %s", local_path, self._redact(e))
             return False
 
+    async def _download(self, file_url: str, local_path: str) -> bool:
+        """Download file, splitting large ones into parallel byte-range shards
+
+        The first ranged GET doubles as the size probe, so files below
+        DOWNLOAD_SHARD_MIN_SIZE cost a single request.
+        """
+        headers = {"Range": f"bytes=0-{DOWNLOAD_SHARD_MIN_SIZE - 1}"}
+        async with self.download_client.stream("GET", file_url, headers=headers) as response:
+            if response.status_code == 200:
+                # Server ignored the range: this is already the whole file
+                await self._write_stream(response, local_path)
+                return True
+            if response.status_code != 206:
+                return False
+            head = await response.aread()
+            size = _content_range_size(response.headers.get("content-range", ""))
+
+        if size is not None and size <= len(head):
+            await self._write_parts(local_path, [head])
+            return True
+        if size is not None:
+            shards = await self._fetch_ranges(file_url, len(head), size)
+            if shards is not None:
+                await self._write_parts(local_path, [head, *shards])
+                return True
+            logger.warning("Ranged download to %s failed, retrying as single stream", local_path)
+        return await self._download_stream(file_url, local_path)
+
+    async def _fetch_ranges(self, file_url: str, start: int, size: int) -> Optional[List[bytes]]:
+        """Fetch bytes [start, size) as parallel range requests, or None on any failure"""
+        step = -(-(size - start) // DOWNLOAD_SHARDS)
+
+        async def fetch_shard(first: int) -> Optional[bytes]:
+            last = min(first + step, size) - 1
+            response = await self.download_client.get(file_url, headers={"Range": f"bytes={first}-{last}"})
+            if response.status_code != 206 or len(response.content) != last - first + 1:
+                return None
+            return response.content
+
+        # return_exceptions keeps one failing shard from orphaning the others
+        shards = await asyncio.gather(
+            *(fetch_shard(first) for first in range(start, size, step)),
+            return_exceptions=True,
+        )
+        if not all(isinstance(shard, bytes) for shard in shards):
+            return None
+        return shards
+
+    async def _write_parts(self, local_path: str, parts: List[bytes]):
+        """Write contiguous file parts in order"""
+        async with aiofiles.open(local_path, "wb") as f:
+            for part in parts:
+                await f.write(part)
+
+    async def _write_stream(self, response: httpx.Response, local_path: str):
+        """Write a streamed response body to disk"""
+        async with aiofiles.open(local_path, "wb") as f:
+            async for chunk in response.aiter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                await f.write(chunk)
+
+    async def _download_stream(self, file_url: str, local_path: str) -> bool:
+        """Download file as a single streamed GET"""
+        async with self.download_client.stream("GET", file_url) as response:
+            if response.status_code == 200:
+                await self._write_stream(response, local_path)
+                return True
+        return False
+
     async def close(self):
         await self.client.aclose()
+        await self.download_client.aclose()
+
+
+def _content_range_size(content_range: str) -> Optional[int]:
+    """Total size from a Content-Range header ("bytes 0-99/1234"), if known"""
+    total = content_range.rpartition("/")[2]
+    return int(total) if total.isdigit() else None
 
 
 # Global Telegram API instance
@@ -131,14 +296,49 @@ telegram_api: Optional[TelegramAPI] = None
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     global telegram_api
+    _log_listener.start()
+    logger.addHandler(_log_queue_handler)
+    logger.removeHandler(_log_handler)
     if BOT_TOKEN:
         telegram_api = TelegramAPI(BOT_TOKEN)
-        print(f"Telegram API initialized with token")
+        logger.info("Telegram API initialized with token")
+    else:
+        logger.warning("No BOT_TOKEN set. API will work in mock mode.")
+    if WEB_CONCURRENCY > 1 and not REDIS_URL:
+        logger.warning("Multiple workers without REDIS_URL: each worker keeps its own response cache.")
+    if REDIS_URL:
+        redis = aioredis.from_url(REDIS_URL)
+        FastAPICache.init(RedisBackend(redis), prefix=CACHE_PREFIX)
     else:
-        print("WARNING: No BOT_TOKEN set. API will work in mock mode.")
+        FastAPICache.init(InMemoryBackend(), prefix=CACHE_PREFIX)
     yield
     if telegram_api:
         await telegram_api.close()
+    logger.addHandler(_log_handler)
+    logger.removeHandler(_log_queue_handler)
+    _log_listener.stop()
+
+
+class AccelRedirectMiddleware:
+    """ASGI middleware delegating /assets/* to the fronting nginx via X-Accel-Redirect"""
+
+    def __init__(self, app, prefix: str):
+        self.app = app
+        self.prefix = prefix.rstrip("/")
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] == "http" and path.startswith("/assets/") and ".." not in path:
+            # Header must stay percent-encoded ASCII, so build it from the raw
+            # request path rather than the decoded one
+            raw_path = (scope.get("raw_path") or b"").split(b"?", 1)[0]
+            if not raw_path.startswith(b"/assets/"):
+                raw_path = path.encode()
+            internal_path = self.prefix + quote_from_bytes(raw_path[len(b"/assets"):], safe="/%")
+            response = Response(headers={"X-Accel-Redirect": internal_path})
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
 
 
 # Create FastAPI app
@@ -146,9 +346,13 @@ app = FastAPI(
     title="TMoji Web API",
     description="Backend API for Telegram Premium Custom Emojis",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+if ASSETS_ACCEL_PREFIX:
+    app.add_middleware(AccelRedirectMiddleware, prefix=ASSETS_ACCEL_PREFIX)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -159,38 +363,126 @@ app.add_middleware(
 )
 
 
+# Downloaded emoji files; StaticFiles streams them with sendfile where available
+app.mount("/assets", StaticFiles(directory=ASSETS_DIR, html=False), name="assets")
+
+
 # Helper functions
+# Pattern: https://t.me/addemoji/PACK_NAME or t.me/addemoji/PACK_NAME
+_PACK_URL_RE = re.compile(r'(?:https?://)?t\.me/addemoji/([a-zA-Z0-9_]+)')
+_PACK_URL_PREFIXES = ("https://t.me/addemoji/", "http://t.me/addemoji/", "t.me/addemoji/")
+
+
 def extract_pack_name(url_or_name: str) -> str:
     """Extract pack name from Telegram URL or return as-is"""
-    # Pattern: https://t.me/addemoji/PACK_NAME or t.me/addemoji/PACK_NAME
-    pattern = r'(?:https?://)?t\.me/addemoji/([a-zA-Z0-9_]+)'
-    match = re.search(pattern, url_or_name)
+    if "t.me/addemoji/" not in url_or_name:
+        # Bare pack name, possibly with a query string (e.g. "?startapp=...")
+        return url_or_name.split("?", 1)[0]
+
+    # Fast path: canonical link, name ends at the next path/query separator
+    for prefix in _PACK_URL_PREFIXES:
+        if url_or_name.startswith(prefix):
+            name = url_or_name[len(prefix):].split("/", 1)[0].split("?", 1)[0]
+            if name.isascii() and name.replace("_", "").isalnum():
+                return name
+            break
+
+    match = _PACK_URL_RE.search(url_or_name)
     if match:
         return match.group(1)
     return url_or_name
 
 
+async def resolve_file_urls(stickers: List[dict]) -> List[str]:
+    """Resolve download URLs for all stickers concurrently"""
+    file_urls = await asyncio.gather(
+        *(telegram_api.get_file(sticker.get("file_id")) for sticker in stickers)
+    )
+    return [file_url or "" for file_url in file_urls]
+
+
+def _missing_file_url(value: BaseModel) -> bool:
+    """Whether an EmojiData or EmojiPack has a sticker without a file URL"""
+    if isinstance(value, EmojiPack):
+        return any(not sticker.file_url for sticker in value.stickers)
+    return isinstance(value, EmojiData) and not value.file_url
+
+
+async def cached_response(
+    request: Request,
+    namespace: str,
+    key: str,
+    expire: int,
+    model: Type[BaseModel],
+    build: Callable[[], Awaitable[BaseModel]],
+) -> Response:
+    """
+    Serve a JSON response from the response cache, building it on a miss.
+
+    Entries are stored as ETag + body, so hits skip serialization and
+    hashing. If-None-Match is answered with 304 and max-age is the entry's
+    remaining TTL.
+    """
+    backend = FastAPICache.get_backend()
+    cache_key = f"{FastAPICache.get_prefix()}:{namespace}:{key}"
+
+    ttl, entry = 0, None
+    if request.headers.get("cache-control") not in ("no-store", "no-cache"):
+        try:
+            ttl, entry = await backend.get_with_ttl(cache_key)
+        except Exception:
+            logger.warning("Error reading cache key %s", cache_key, exc_info=True)
+
+    if entry is None:
+        # Validate once here; cache hits are served as stored
+        value = model.model_validate((await build()).model_dump())
+        body = value.model_dump_json().encode()
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        # A failed getFile (e.g. a 429) leaves file_url empty; keep such
+        # partial results only briefly so the next requests retry
+        ttl = min(expire, CACHE_TTL_SHORT) if _missing_file_url(value) else expire
+        try:
+            await backend.set(cache_key, etag.encode() + b"\n" + body, ttl)
+        except Exception:
+            logger.warning("Error setting cache key %s", cache_key, exc_info=True)
+    else:
+        if isinstance(entry, str):
+            entry = entry.encode()
+        etag_bytes, _, body = entry.partition(b"\n")
+        etag = etag_bytes.decode()
+
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max(ttl, 0)}"}
+    if_none_match = request.headers.get("if-none-match", "")
+    client_etags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    if if_none_match.strip() == "*" or etag in client_etags:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 def sticker_to_emoji_data(sticker: dict, file_url: str) -> EmojiData:
     """Convert Telegram Sticker object to EmojiData"""
-    file_type = "png"
-    if sticker.get("is_animated"):
-        file_type = "tgs"
-    elif sticker.get("is_video"):
-        file_type = "webm"
-
-    return EmojiData(
-        id=sticker.get("custom_emoji_id", sticker.get("file_id", "")),
-        short_name=sticker.get("set_name", "emoji") + "_" + str(sticker.get("file_unique_id", "")[:8]),
-        emoji=sticker.get("emoji"),
+    # Hot path for large packs: bind dict.get once and read each flag once
+    get = sticker.get
+    is_animated = get("is_animated", False)
+    is_video = get("is_video", False)
+    set_name = get("set_name")
+    file_type = "tgs" if is_animated else "webm" if is_video else "png"
+
+    # Telegram payloads are trusted; skip validation here, responses are
+    # still validated once before they are cached
+    return EmojiData.model_construct(
+        id=get("custom_emoji_id") or get("file_id", ""),
+        short_name=f"{set_name or 'emoji'}_{get('file_unique_id', '')[:8]}",
+        emoji=get("emoji"),
         file_type=file_type,
         file_url=file_url,
         thumbnail_url=None,
-        width=sticker.get("width", 512),
-        height=sticker.get("height", 512),
-        is_animated=sticker.get("is_animated", False),
-        is_video=sticker.get("is_video", False),
-        set_name=sticker.get("set_name"),
-        needs_repainting=sticker.get("needs_repainting", False)
+        width=get("width", 512),
+        height=get("height", 512),
+        is_animated=is_animated,
+        is_video=is_video,
+        set_name=set_name,
+        needs_repainting=get("needs_repainting", False)
     )
 
 
@@ -207,7 +499,7 @@ async def root():
 
 
 @app.get("/pack", response_model=EmojiPack, responses={404: {"model": ErrorResponse}})
-async def get_pack(url: str = Query(..., description="Telegram emoji pack URL or name")):
+async def get_pack(request: Request, url: str = Query(..., description="Telegram emoji pack URL or name")):
     """
     Load emoji pack by Telegram link or pack name.
 
@@ -216,33 +508,36 @@ async def get_pack(url: str = Query(..., description="Telegram emoji pack URL or
     if not telegram_api:
         raise HTTPException(status_code=503, detail="Telegram API not configured")
 
+    # Every link form of the same pack shares one cache entry
     pack_name = extract_pack_name(url)
 
-    # Fetch from Telegram
-    sticker_set = await telegram_api.get_sticker_set(pack_name)
-    if not sticker_set:
-        raise HTTPException(status_code=404, detail=f"Pack not found: {pack_name}")
+    async def build() -> EmojiPack:
+        # Fetch from Telegram
+        sticker_set = await telegram_api.get_sticker_set(pack_name)
+        if not sticker_set:
+            raise HTTPException(status_code=404, detail=f"Pack not found: {pack_name}")
 
-    # Process stickers
-    stickers = []
-    for sticker in sticker_set.get("stickers", []):
-        file_id = sticker.get("file_id")
-        file_url = await telegram_api.get_file(file_id) or ""
+        # Process stickers
+        raw_stickers = sticker_set.get("stickers", [])
+        file_urls = await resolve_file_urls(raw_stickers)
+        stickers = [
+            sticker_to_emoji_data(sticker, file_url)
+            for sticker, file_url in zip(raw_stickers, file_urls)
+        ]
 
-        emoji_data = sticker_to_emoji_data(sticker, file_url)
-        stickers.append(emoji_data)
+        return EmojiPack(
+            name=sticker_set.get("name", pack_name),
+            title=sticker_set.get("title", pack_name),
+            sticker_type=sticker_set.get("sticker_type", "custom_emoji"),
+            stickers=stickers,
+            thumbnail=sticker_set.get("thumbnail", {}).get("file_id")
+        )
 
-    return EmojiPack(
-        name=sticker_set.get("name", pack_name),
-        title=sticker_set.get("title", pack_name),
-        sticker_type=sticker_set.get("sticker_type", "custom_emoji"),
-        stickers=stickers,
-        thumbnail=sticker_set.get("thumbnail", {}).get("file_id")
-    )
+    return await cached_response(request, "pack", pack_name, CACHE_TTL_NORMAL, EmojiPack, build)
 
 
 @app.get("/emoji/{emoji_id}", response_model=EmojiData, responses={404: {"model": ErrorResponse}})
-async def get_emoji(emoji_id: str):
+async def get_emoji(request: Request, emoji_id: str):
     """
     Get single emoji by custom emoji ID.
 
@@ -251,19 +546,43 @@ async def get_emoji(emoji_id: str):
     if not telegram_api:
         raise HTTPException(status_code=503, detail="Telegram API not configured")
 
-    stickers = await telegram_api.get_custom_emoji_stickers([emoji_id])
-    if not stickers:
-        raise HTTPException(status_code=404, detail=f"Emoji not found: {emoji_id}")
+    async def build() -> EmojiData:
+        stickers = await telegram_api.get_custom_emoji_stickers([emoji_id])
+        if not stickers:
+            raise HTTPException(status_code=404, detail=f"Emoji not found: {emoji_id}")
+
+        sticker = stickers[0]
+        file_id = sticker.get("file_id")
+        file_url = await telegram_api.get_file(file_id) or ""
+
+        return sticker_to_emoji_data(sticker, file_url)
+
+    return await cached_response(request, "emoji", emoji_id, CACHE_TTL_SHORT, EmojiData, build)
+
+
+@app.post("/emoji/batch", response_model=List[EmojiData])
+async def get_emoji_batch(req: EmojiBatchRequest):
+    """
+    Get multiple emojis by custom emoji ID in one request.
 
-    sticker = stickers[0]
-    file_id = sticker.get("file_id")
-    file_url = await telegram_api.get_file(file_id) or ""
+    - **ids**: Custom emoji IDs; unknown IDs are omitted from the result
+    """
+    if not telegram_api:
+        raise HTTPException(status_code=503, detail="Telegram API not configured")
 
-    return sticker_to_emoji_data(sticker, file_url)
+    if not req.ids:
+        return []
+
+    stickers = await telegram_api.get_custom_emoji_stickers(req.ids)
+    file_urls = await resolve_file_urls(stickers)
+    return [
+        sticker_to_emoji_data(sticker, file_url)
+        for sticker, file_url in zip(stickers, file_urls)
+    ]
 
 
 @app.get("/manifest/{pack_id}", response_model=EmojiPack, responses={404: {"model": ErrorResponse}})
-async def get_manifest(pack_id: str):
+async def get_manifest(request: Request, pack_id: str):
     """
     Get pack manifest JSON by pack ID/name.
 
@@ -272,28 +591,32 @@ async def get_manifest(pack_id: str):
     if not telegram_api:
         raise HTTPException(status_code=503, detail="Telegram API not configured")
 
-    sticker_set = await telegram_api.get_sticker_set(pack_id)
-    if not sticker_set:
-        raise HTTPException(status_code=404, detail=f"Pack not found: {pack_id}")
+    async def build() -> EmojiPack:
+        sticker_set = await telegram_api.get_sticker_set(pack_id)
+        if not sticker_set:
+            raise HTTPException(status_code=404, detail=f"Pack not found: {pack_id}")
 
-    stickers = []
-    for sticker in sticker_set.get("stickers", []):
-        file_id = sticker.get("file_id")
-        file_url = await telegram_api.get_file(file_id) or ""
-        emoji_data = sticker_to_emoji_data(sticker, file_url)
-        stickers.append(emoji_data)
-
-    return EmojiPack(
-        name=sticker_set.get("name", pack_id),
-        title=sticker_set.get("title", pack_id),
-        sticker_type=sticker_set.get("sticker_type", "custom_emoji"),
-        stickers=stickers
-    )
+        raw_stickers = sticker_set.get("stickers", [])
+        file_urls = await resolve_file_urls(raw_stickers)
+        stickers = [
+            sticker_to_emoji_data(sticker, file_url)
+            for sticker, file_url in zip(raw_stickers, file_urls)
+        ]
+
+        return EmojiPack(
+            name=sticker_set.get("name", pack_id),
+            title=sticker_set.get("title", pack_id),
+            sticker_type=sticker_set.get("sticker_type", "custom_emoji"),
+            stickers=stickers
+        )
+
+    return await cached_response(request, "manifest", pack_id, CACHE_TTL_LONG, EmojiPack, build)
 
 
 @app.post("/cache/clear")
 async def clear_cache():
-    """Clear server-side cache (if implemented)"""
+    """Clear server-side response cache"""
+    await FastAPICache.clear()
     return {"status": "ok", "message": "Cache cleared"}
 
 
@@ -309,4 +632,12 @@ async def health():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Import string form is required for multi-worker mode
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=WEB_CONCURRENCY,
+        loop="auto",  # uvloop when installed (not available on Windows)
+        http="httptools",
+    )
@@ -69,10 +69,30 @@ export class EmojiAPI {
    * Fetch multiple emojis by IDs
    */
   async getEmojis(ids: string[]): Promise<EmojiData[]> {
-    const results = await Promise.all(
-      ids.map(id => this.getEmoji(id))
-    );
-    return results.filter((e): e is EmojiData => e !== null);
+    // Backend accepts up to 200 IDs per batch (Telegram's limit)
+    const batches: string[][] = [];
+    for (let i = 0; i < ids.length; i += 200) {
+      batches.push(ids.slice(i, i + 200));
+    }
+    const results = await Promise.all(batches.map(batch => this.getEmojiBatch(batch)));
+    return results.flat();
+  }
+
+  private async getEmojiBatch(ids: string[]): Promise<EmojiData[]> {
+    try {
+      const response = await fetch(`${this.baseUrl}/emoji/batch`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ ids }),
+      });
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+      }
+      return await response.json();
+    } catch (error) {
+      console.error('Failed to fetch emojis:', error);
+      return [];
+    }
   }
 
   /**
@@ -5,13 +5,12 @@ Build and Package Script for TMoji Web
 This script:
 1. Builds the frontend library (if npm is available)
 2. Minifies assets
-3. Creates production folder structure
-4. Zips the entire repository
+3. Zips the repository straight from the source tree
 """
 
 import os
+import re
 import sys
-import shutil
 import zipfile
 import subprocess
 from pathlib import Path
@@ -20,7 +19,6 @@ from datetime import datetime
 # Configuration
 PROJECT_NAME = "tmoji-web"
 VERSION = "1.0.0"
-OUTPUT_DIR = Path("dist")
 ZIP_NAME = f"{PROJECT_NAME}-v{VERSION}.zip"
 
 # Files and directories to include
@@ -45,11 +43,46 @@ EXCLUDE = [
     "node_modules",
     ".DS_Store",
     "*.log",
-    "dist/",
     "build/",
     "*.zip",
 ]
 
+# Already-compressed formats, stored as-is in the archive
+STORED_EXTENSIONS = {
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".webp",
+    ".webm",
+    ".tgs",
+    ".gz",
+    ".zip",
+    ".woff2",
+}
+
+
+def compile_exclude(patterns: list) -> re.Pattern:
+    """Compile EXCLUDE patterns into a single regex
+
+    "dir/" matches a whole path component, "*.ext" matches a suffix and
+    anything else matches as a substring.
+    """
+    sep = re.escape(os.sep)
+    parts = []
+    for pattern in patterns:
+        if pattern.endswith('/'):
+            name = re.escape(pattern.rstrip('/'))
+            parts.append(f"(?:^|{sep}){name}(?:{sep}|$)")
+        elif pattern.startswith('*'):
+            parts.append(f"{re.escape(pattern[1:])}$")
+        else:
+            parts.append(re.escape(pattern))
+    return re.compile("|".join(parts))
+
+
+EXCLUDE_RE = compile_exclude(EXCLUDE)
+
 
 def log(message: str):
     """Print log message with timestamp"""
@@ -58,17 +91,7 @@ def log(message: str):
 
 def should_exclude(path: Path) -> bool:
     """Check if path should be excluded"""
-    path_str = str(path)
-    for pattern in EXCLUDE:
-        if pattern.endswith('/'):
-            if pattern.rstrip('/') in path_str.split(os.sep):
-                return True
-        elif pattern.startswith('*'):
-            if path_str.endswith(pattern[1:]):
-                return True
-        elif pattern in path_str:
-            return True
-    return False
+    return EXCLUDE_RE.search(str(path)) is not None
 
 
 def build_frontend():
@@ -99,66 +122,9 @@ def build_frontend():
         log("npm not found, skipping frontend build")
 
 
-def create_structure():
-    """Create production folder structure"""
-    log("Creating production structure...")
-
-    # Clean previous build
-    if OUTPUT_DIR.exists():
-        shutil.rmtree(OUTPUT_DIR)
-
-    OUTPUT_DIR.mkdir(exist_ok=True)
-
-    # Create subdirectories
-    (OUTPUT_DIR / "frontend").mkdir(exist_ok=True)
-    (OUTPUT_DIR / "backend").mkdir(exist_ok=True)
-    (OUTPUT_DIR / "docs").mkdir(exist_ok=True)
-    (OUTPUT_DIR / "examples").mkdir(exist_ok=True)
-
-
-def copy_files():
-    """Copy files to output directory"""
-    log("Copying files...")
-
-    for item in INCLUDE:
-        src = Path(item)
-        if not src.exists():
-            log(f"Warning: {item} not found, skipping")
-            continue
-
-        dst = OUTPUT_DIR / item
-
-        if src.is_dir():
-            shutil.copytree(src, dst, ignore=shutil.ignore_patterns(*EXCLUDE))
-        else:
-            shutil.copy2(src, dst)
-
-
-def create_zip():
-    """Create zip archive"""
-    log(f"Creating {ZIP_NAME}...")
-
-    with zipfile.ZipFile(ZIP_NAME, 'w', zipfile.ZIP_DEFLATED) as zf:
-        for root, dirs, files in os.walk(OUTPUT_DIR):
-            # Filter excluded directories
-            dirs[:] = [d for d in dirs if not should_exclude(Path(root) / d)]
-
-            for file in files:
-                file_path = Path(root) / file
-                if should_exclude(file_path):
-                    continue
-
-                arcname = str(file_path.relative_to(OUTPUT_DIR.parent))
-                zf.write(file_path, arcname)
-
-    # Get file size
-    size = os.path.getsize(ZIP_NAME)
-    log(f"Created {ZIP_NAME} ({size / 1024 / 1024:.2f} MB)")
-
-
-def generate_manifest():
-    """Generate manifest.json with build info"""
-    manifest = {
+def generate_manifest() -> dict:
+    """Generate manifest.json contents with build info"""
+    return {
         "name": PROJECT_NAME,
         "version": VERSION,
         "build_date": datetime.now().isoformat(),
@@ -170,9 +136,52 @@ def generate_manifest():
         }
     }
 
+
+def write_file(zf: zipfile.ZipFile, file_path: Path):
+    """Add a single source file to the archive under PROJECT_NAME/"""
+    arcname = f"{PROJECT_NAME}/{file_path.as_posix()}"
+    if file_path.suffix.lower() in STORED_EXTENSIONS:
+        zf.write(file_path, arcname, compress_type=zipfile.ZIP_STORED)
+    else:
+        zf.write(file_path, arcname, compresslevel=6)
+
+
+def create_zip():
+    """Create zip archive directly from INCLUDE paths"""
+    log(f"Creating {ZIP_NAME}...")
+
     import json
-    with open(OUTPUT_DIR / "manifest.json", "w") as f:
-        json.dump(manifest, f, indent=2)
+
+    with zipfile.ZipFile(ZIP_NAME, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for item in INCLUDE:
+            src = Path(item)
+            if not src.exists():
+                log(f"Warning: {item} not found, skipping")
+                continue
+
+            if src.is_file():
+                if not should_exclude(src):
+                    write_file(zf, src)
+                continue
+
+            for root, dirs, files in os.walk(src):
+                # Filter excluded directories
+                dirs[:] = [d for d in dirs if not should_exclude(Path(root) / d)]
+
+                for file in files:
+                    file_path = Path(root) / file
+                    if not should_exclude(file_path):
+                        write_file(zf, file_path)
+
+        manifest = generate_manifest()
+        zf.writestr(
+            f"{PROJECT_NAME}/manifest.json",
+            json.dumps(manifest, indent=2)
+        )
+
+    # Get file size
+    size = os.path.getsize(ZIP_NAME)
+    log(f"Created {ZIP_NAME} ({size / 1024 / 1024:.2f} MB)")
 
 
 def main():
@@ -181,14 +190,10 @@ def main():
 
     # Build steps
     build_frontend()
-    create_structure()
-    copy_files()
-    generate_manifest()
     create_zip()
 
     log("Build complete!")
     log(f"Output: {ZIP_NAME}")
-    log(f"Extracted: {OUTPUT_DIR}/")
 
 
 if __name__ == "__main__":